@@ -8,24 +8,25 @@ evaluate.py
 """
 
 import os
+import numpy as np
 import pandas as pd
 from sklearn.metrics import silhouette_score
-from sklearn.cluster import KMeans
 
 def evaluate_models():
     # Define path to analysis output folder
     analysis_folder = os.path.join('data', 'analysis')
 
     # Evaluate clustering performance if clustered data file exists
-    clustered_file = os.path.join(analysis_folder, 'clustered_employers.csv')
+    clustered_file = os.path.join(analysis_folder, 'clustered_employers.parquet')
     if os.path.exists(clustered_file):
-        df = pd.read_csv(clustered_file)
+        df = pd.read_parquet(clustered_file, engine='pyarrow')
         features = ['Pct_White', 'Pct_Black', 'Pct_Hispanic', 'Pct_Asian']
         X = df[features]
 
-        kmeans = KMeans(n_clusters=3, random_state=42)
         labels = df['Cluster']
-        score = silhouette_score(X, labels)
+        # Sample at most 10k rows so the pairwise distance matrix stays bounded
+        score = silhouette_score(X.to_numpy(dtype=np.float32), labels, metric='euclidean',
+                                 sample_size=min(10_000, len(X)), random_state=42)
         print(f"Silhouette Score for KMeans clustering: {score:.3f}")
 
         # Save silhouette score to file
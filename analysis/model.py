@@ -6,13 +6,81 @@ model.py
 """
 
 import os
+import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score, mean_squared_error
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score, mean_squared_error, r2_score
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
-
-def run_analysis():
+from sklearn.preprocessing import OneHotEncoder
+
+def _pct_and_diversity(counts, totals):
+    # Percent of total for each count column and the diversity index
+    # (1 - sum of squared shares). Each row's total is inverted once and the
+    # shares are a multiply, reusing one output buffer throughout
+    inv = np.full_like(totals, np.nan)
+    np.reciprocal(totals, out=inv, where=totals > 0)
+    pct = np.multiply(counts, inv[:, None])
+    diversity = np.einsum('ij,ij->i', pct, pct)
+    np.subtract(1.0, diversity, out=diversity)
+    np.multiply(pct, 100.0, out=pct)
+    return pct, diversity
+
+def _write_text(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+def _flush_writes(writes):
+    # Run queued (stage, writer) pairs concurrently; pandas/pyarrow release the
+    # GIL while encoding and writing. A failed write is reported under the stage
+    # that queued it without stopping the others. Returns the failed stages.
+    failed = set()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [(stage, executor.submit(write)) for stage, write in writes]
+        for stage, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"{stage} failed: {e}")
+                failed.add(stage)
+    return failed
+
+def _describe(df):
+    # Same layout as DataFrame.describe().transpose(), computed over one NumPy
+    # block; all three quartiles come from a single percentile call
+    block = df.to_numpy(dtype=np.float64)
+    q25, q50, q75 = np.percentile(block, [25, 50, 75], axis=0)
+    return pd.DataFrame({
+        'count': np.full(block.shape[1], float(len(block))),
+        'mean': block.mean(axis=0),
+        'std': block.std(axis=0, ddof=1),
+        'min': block.min(axis=0),
+        '25%': q25,
+        '50%': q50,
+        '75%': q75,
+        'max': block.max(axis=0),
+    }, index=df.columns)
+
+def _group_mean_predict(group_means, groups, fallback):
+    # Look up each row's group mean; groups unseen in training get the overall mean
+    pred = group_means.reindex(groups).to_numpy(dtype=np.float64)
+    return np.where(np.isnan(pred), fallback, pred)
+
+def run_analysis(df=None, path=None):
+    """
+    Run the DEI metrics, clustering and regression analysis.
+
+    Args:
+        df (DataFrame, optional): Transformed data from transform_data(). When
+            omitted, the data is loaded from `path`.
+        path (str, optional): Transformed Parquet file to load when `df` is not
+            given. Defaults to the first transformed_*.parquet in data/processed.
+    Returns:
+        DataFrame: Rows with complete demographic percentages plus derived metrics.
+    """
     # Setup paths for processed data and analysis outputs
     processed_folder = os.path.join('data', 'processed')
     analysis_folder = os.path.join('data', 'analysis')
@@ -20,28 +88,32 @@ def run_analysis():
     os.makedirs(analysis_folder, exist_ok=True)
     os.makedirs(eval_folder, exist_ok=True)
 
-    # Automatically select the first transformed CSV file
-    files = [f for f in os.listdir(processed_folder) 
-             if f.startswith("transformed_") and f.endswith(".csv")]
-    if not files:
-        print("No transformed CSV file found. Run transform first.")
-        return
+    # Load the given (or first) transformed Parquet file unless the data was
+    # handed over in memory
+    if df is None:
+        if path is not None:
+            data_path = path
+            filename = os.path.basename(data_path)
+            print(f"Using {filename} for analysis.")
+        else:
+            files = sorted(glob.iglob(os.path.join(processed_folder, "transformed_*.parquet")))
+            if not files:
+                print("No transformed Parquet file found. Run transform first.")
+                return
 
-    filename = files[0]
-    data_path = os.path.join(processed_folder, filename)
-    print(f"Automatically selected {filename} for analysis.")
+            data_path = files[0]
+            filename = os.path.basename(data_path)
+            print(f"Automatically selected {filename} for analysis.")
 
-    try:
-        df = pd.read_csv(data_path)
-    except Exception as e:
-        print(f"Error reading {filename}: {e}")
-        return
-
-    # Identify the total employees column for percentage calculations
-    total_col = next((c for c in ['Total_Employees', 'TOTAL10', 'TOTAL1'] if c in df.columns), None)
-    if total_col is None:
-        print("No total employees column found for percentage calculations.")
-        return
+        # Parquet keeps the column types written by transform, so no conversion
+        # pass is needed after loading
+        try:
+            df = pd.read_parquet(data_path, engine='pyarrow')
+        except Exception as e:
+            print(f"Error reading {filename}: {e}")
+            return
+    else:
+        print("Using transformed data passed in memory for analysis.")
 
     # Demographic count columns
     demo_cols = {
@@ -50,51 +122,71 @@ def run_analysis():
         'Pct_Hispanic': 'HISPT10',
         'Pct_Asian': 'ASIANT10',
     }
+    total_candidates = ['Total_Employees', 'TOTAL10', 'TOTAL1']
 
-    # Calculate percentages
-    df[total_col] = pd.to_numeric(df[total_col], errors='coerce')
-    for pct_col, count_col in demo_cols.items():
-        if count_col in df.columns:
-            df[count_col] = pd.to_numeric(df[count_col], errors='coerce')
-            df[pct_col] = df[count_col] / df[total_col] * 100
-        else:
-            df[pct_col] = None
+    # Identify the total employees column for percentage calculations
+    total_col = next((c for c in total_candidates if c in df.columns), None)
+    if total_col is None:
+        print("No total employees column found for percentage calculations.")
+        return
 
+    # Calculate percentages and DEI metrics in one fused pass; rows with a zero
+    # total and missing count columns are left as NaN. Counts are well below
+    # float32's exact-integer range, so the block is float32
     pct_cols = list(demo_cols.keys())
+    counts = np.column_stack([
+        df[count_col].to_numpy(dtype=np.float32, na_value=np.nan) if count_col in df.columns
+        else np.full(len(df), np.nan, dtype=np.float32)
+        for count_col in demo_cols.values()
+    ])
+    totals = df[total_col].to_numpy(dtype=np.float32, na_value=np.nan)
+    pct, diversity = _pct_and_diversity(counts, totals)
+    metrics = pd.DataFrame(pct, columns=pct_cols, index=df.index)
+    metrics['Pct_Minority'] = 100 - metrics['Pct_White']
+    metrics['Diversity_Index'] = diversity
+    # Replace any percentage columns already computed by transform
+    df = pd.concat([df.drop(columns=metrics.columns, errors='ignore'), metrics], axis=1)
+
     df_clean = df.dropna(subset=pct_cols)
     if df_clean.empty:
         print("No rows with complete demographic percentages found.")
         return
 
-    # Additional DEI metrics
-    df_clean['Pct_Minority'] = 100 - df_clean['Pct_White']
-    df_clean['Diversity_Index'] = df_clean[pct_cols].apply(lambda row: 1 - sum((row/100)**2), axis=1)
+    # Output files are independent, so they are queued here (with the stage that
+    # produced them) and written together on a thread pool at the end; each
+    # stage's "saved" message is printed once its files are written
+    writes = []
+    saved = {}
 
     # Descriptive stats
-    desc_stats = df_clean[pct_cols + ['Pct_Minority','Diversity_Index']].describe().transpose()
-    desc_stats.to_csv(os.path.join(analysis_folder, 'descriptive_stats.csv'))
+    desc_stats = _describe(df_clean[pct_cols + ['Pct_Minority','Diversity_Index']])
+    writes.append(('Descriptive statistics', partial(desc_stats.to_csv, os.path.join(analysis_folder, 'descriptive_stats.csv'))))
 
     # Comparative analysis by Region
     if 'Region' in df_clean.columns:
-        comp_region = df_clean.groupby('Region')[['Pct_White','Pct_Minority','Diversity_Index']].mean().reset_index()
+        comp_region = df_clean.groupby('Region', observed=True)[['Pct_White','Pct_Minority','Diversity_Index']].mean().reset_index()
         comp_region['Diversity_Rank'] = comp_region['Diversity_Index'].rank(ascending=False)
-        comp_region.to_csv(os.path.join(analysis_folder, 'comparative_region_ranked.csv'), index=False)
-        print("Comparative regional analysis saved with diversity ranking.")
+        writes.append(('Comparative regional analysis', partial(comp_region.to_parquet, os.path.join(analysis_folder, 'comparative_region_ranked.parquet'), engine='pyarrow', compression='zstd', index=False)))
+        saved['Comparative regional analysis'] = "Comparative regional analysis saved with diversity ranking."
 
     # KMeans clustering on demographic percentages
     try:
-        X = df_clean[pct_cols]
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init='auto')
+        # float32 halves the bytes moved by the distance kernels; plenty of
+        # precision for percentages in [0, 100]
+        X = df_clean[pct_cols].to_numpy(dtype=np.float32)
+        # Mini-batch Lloyd updates touch only batch_size rows per iteration
+        kmeans = MiniBatchKMeans(n_clusters=3, batch_size=4096, n_init=3, random_state=42)
         df_clean['Cluster'] = kmeans.fit_predict(X)
 
         cluster_summary = df_clean.groupby('Cluster')[pct_cols + ['Pct_Minority','Diversity_Index']].mean().round(1)
-        cluster_summary.to_csv(os.path.join(analysis_folder,'cluster_summary.csv'))
-
-        df_clean[['Cluster'] + pct_cols].to_csv(os.path.join(analysis_folder, 'clustered_employers.csv'), index=False)
-        sil_score = silhouette_score(X, df_clean['Cluster'])
-        with open(os.path.join(eval_folder, 'silhouette_score.txt'), 'w') as f:
-            f.write(f"Silhouette Score: {sil_score:.3f}\n")
-        print(f"KMeans clustering and evaluation saved. Silhouette: {sil_score:.3f}")
+        writes.append(('KMeans clustering', partial(cluster_summary.to_csv, os.path.join(analysis_folder,'cluster_summary.csv'))))
+
+        writes.append(('KMeans clustering', partial(df_clean[['Cluster'] + pct_cols].to_parquet, os.path.join(analysis_folder, 'clustered_employers.parquet'), engine='pyarrow', compression='zstd', index=False)))
+        # Sample at most 10k rows so the pairwise distance matrix stays bounded
+        sil_score = silhouette_score(X, df_clean['Cluster'], metric='euclidean',
+                                     sample_size=min(10_000, len(X)), random_state=42)
+        writes.append(('KMeans clustering', partial(_write_text, os.path.join(eval_folder, 'silhouette_score.txt'), f"Silhouette Score: {sil_score:.3f}\n")))
+        saved['KMeans clustering'] = f"KMeans clustering and evaluation saved. Silhouette: {sil_score:.3f}"
     except Exception as e:
         print(f"KMeans clustering failed: {e}")
 
@@ -105,37 +197,55 @@ def run_analysis():
             if 'Industry_Sector' in df_clean.columns:
                 features_reg.append('Industry_Sector')
             df_reg = df_clean.dropna(subset=features_reg + ['Pct_White'])
-            X_reg = pd.get_dummies(df_reg[features_reg], drop_first=True)
             y_reg = df_reg['Pct_White']
 
-            X_train, X_test, y_train, y_test = train_test_split(X_reg, y_reg, test_size=0.2, random_state=42)
-            model = LinearRegression()
-            model.fit(X_train, y_train)
-            r2_score = model.score(X_test, y_test)
-            y_pred = model.predict(X_test)
+            if len(features_reg) == 1:
+                # One-hot OLS on a single categorical reduces to the per-group mean,
+                # so fit with a groupby instead of building a dummy matrix
+                train_idx, test_idx = train_test_split(df_reg.index, test_size=0.2, random_state=42)
+                y_train, y_test = y_reg.loc[train_idx], y_reg.loc[test_idx]
+                group_means = y_train.groupby(df_reg.loc[train_idx, features_reg[0]], observed=True).mean()
+                y_pred = _group_mean_predict(group_means, df_reg.loc[test_idx, features_reg[0]], y_train.mean())
+                y_fit = _group_mean_predict(group_means, df_reg[features_reg[0]], y_train.mean())
+            else:
+                # Sparse one-hot matrix: one nonzero per feature per row instead of
+                # a dense N x K frame; LinearRegression solves it with LSQR
+                encoder = OneHotEncoder(drop='first', sparse_output=True, dtype=np.float32)
+                X_reg = encoder.fit_transform(df_reg[features_reg])
+                X_train, X_test, y_train, y_test = train_test_split(X_reg, y_reg, test_size=0.2, random_state=42)
+                model = LinearRegression()
+                model.fit(X_train, y_train)
+                y_pred = model.predict(X_test)
+                y_fit = model.predict(X_reg)
+
+            r2 = r2_score(y_test, y_pred)
             mse = mean_squared_error(y_test, y_pred)
 
-            df_reg['Predicted_Pct_White'] = model.predict(X_reg)
-            df_reg.to_csv(os.path.join(analysis_folder,'predicted_diversity.csv'), index=False)
+            df_reg['Predicted_Pct_White'] = y_fit
+            writes.append(('Regression', partial(df_reg.to_parquet, os.path.join(analysis_folder,'predicted_diversity.parquet'), engine='pyarrow', compression='zstd', index=False)))
 
-            with open(os.path.join(eval_folder,'regression_score.txt'),'w') as f:
-                f.write(f"R^2 score: {r2_score:.3f}\nMSE: {mse:.3f}\n")
+            writes.append(('Regression', partial(_write_text, os.path.join(eval_folder,'regression_score.txt'), f"R^2 score: {r2:.3f}\nMSE: {mse:.3f}\n")))
 
-            print(f"Regression evaluation saved. R^2: {r2_score:.3f}, MSE: {mse:.3f}")
+            saved['Regression'] = f"Regression evaluation saved. R^2: {r2:.3f}, MSE: {mse:.3f}"
         except Exception as e:
             print(f"Regression failed: {e}")
 
     # Generate HR-friendly insights summary
-    with open(os.path.join(analysis_folder,'insights.txt'),'w') as f:
-        f.write("Key DEI Insights:\n")
-        f.write(f"- Average % White: {df_clean['Pct_White'].mean():.1f}%\n")
-        f.write(f"- Average % Minority: {df_clean['Pct_Minority'].mean():.1f}%\n")
-        f.write(f"- Average Diversity Index: {df_clean['Diversity_Index'].mean():.2f}\n")
-        f.write("- Cluster profiles saved in 'cluster_summary.csv'\n")
-        if 'Region' in df_clean.columns:
-            f.write("- Region diversity ranking saved in 'comparative_region_ranked.csv'\n")
-        f.write("- Predicted vs actual diversity saved in 'predicted_diversity.csv'\n")
-    print("HR-friendly insights report saved as 'insights.txt'")
+    insights = "Key DEI Insights:\n"
+    insights += f"- Average % White: {df_clean['Pct_White'].mean():.1f}%\n"
+    insights += f"- Average % Minority: {df_clean['Pct_Minority'].mean():.1f}%\n"
+    insights += f"- Average Diversity Index: {df_clean['Diversity_Index'].mean():.2f}\n"
+    insights += "- Cluster profiles saved in 'cluster_summary.csv'\n"
+    if 'Region' in df_clean.columns:
+        insights += "- Region diversity ranking saved in 'comparative_region_ranked.parquet'\n"
+    insights += "- Predicted vs actual diversity saved in 'predicted_diversity.parquet'\n"
+    writes.append(('Insights report', partial(_write_text, os.path.join(analysis_folder,'insights.txt'), insights)))
+    saved['Insights report'] = "HR-friendly insights report saved as 'insights.txt'"
+
+    failed = _flush_writes(writes)
+    for stage, message in saved.items():
+        if stage not in failed:
+            print(message)
 
     return df_clean
 
@@ -1,6 +1,7 @@
 """
-This script prompts the user to select a CSV file using a GUI file picker (via Tkinter),
-then copies the selected file into the 'data/extracted' directory while preserving the original filename.
+This script copies a raw EEOC CSV file (data/EEO1_2023_PUF.csv by default, or the path
+given with --input) into the 'data/extracted' directory as eeoc_data.csv and loads it.
+No GUI toolkit is needed, so it runs headless: python -m etl.extract --input path/to.csv
 
 This is used to streamline the import of raw EEOC CSV datasets into the project structure. Designed as a simple intake step in the EEOC workforce diversity data pipeline.
 
@@ -8,16 +9,33 @@ extract.py
 """
 
 import os
+import argparse
 import shutil
 import pandas as pd
 
-def extract_eeoc_data():
+# Buffer size for the copy fallback; much larger than shutil's default chunk
+COPY_BUFSIZE = 4 * 1024 * 1024
+
+def _copy_file(source_path, dest_path):
+    # Stream the file in large blocks when a hardlink is not possible
+    with open(source_path, "rb") as fsrc, open(dest_path, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, length=COPY_BUFSIZE)
+
+def extract_eeoc_data(chunksize=None, source_path=None, load=True):
     """
     Extracts the EEOC dataset from the /data folder and copies it to /data/extracted.
+    Args:
+        source_path (str, optional): Raw CSV to extract. Defaults to data/EEO1_2023_PUF.csv.
+        chunksize (int, optional): If set, return an iterator of DataFrames with
+            this many rows each instead of loading the whole file at once.
+        load (bool): If False, only place the file in data/extracted and return
+            its path without reading any rows.
     Returns:
-        DataFrame: Raw EEOC data for further processing.
+        DataFrame: Raw EEOC data for further processing, a chunk iterator
+        when `chunksize` is given, or the extracted path when `load` is False.
     """
-    source_path = os.path.join("data", "EEO1_2023_PUF.csv")
+    if source_path is None:
+        source_path = os.path.join("data", "EEO1_2023_PUF.csv")
     extracted_dir = os.path.join("data", "extracted")
     extracted_path = os.path.join(extracted_dir, "eeoc_data.csv")
 
@@ -28,12 +46,31 @@ def extract_eeoc_data():
     # Ensure extracted folder exists
     os.makedirs(extracted_dir, exist_ok=True)
 
-    # Copy and rename
-    shutil.copy(source_path, extracted_path)
-    print(f"Copied dataset from {source_path} to {extracted_path}")
+    # Hardlink instead of copying when possible so no bytes are duplicated;
+    # fall back to a buffered copy across filesystems
+    if os.path.exists(extracted_path) and os.path.samefile(source_path, extracted_path):
+        print(f"{extracted_path} is already the source dataset, skipping copy")
+    else:
+        if os.path.exists(extracted_path):
+            os.remove(extracted_path)
+        try:
+            os.link(source_path, extracted_path)
+            print(f"Linked dataset from {source_path} to {extracted_path}")
+        except OSError:
+            _copy_file(source_path, extracted_path)
+            print(f"Copied dataset from {source_path} to {extracted_path}")
+
+    if not load:
+        print(f"Extraction complete. Dataset placed at {extracted_path}.")
+        return extracted_path
+
+    # Stream the CSV in chunks to keep memory bounded by the chunk size
+    if chunksize:
+        print(f"Extraction complete. Streaming rows in chunks of {chunksize}.")
+        return pd.read_csv(extracted_path, chunksize=chunksize, engine="c", low_memory=True)
 
-    # Load CSV into DataFrame
-    df = pd.read_csv(extracted_path)
+    # Load CSV into DataFrame using the multithreaded PyArrow parser
+    df = pd.read_csv(extracted_path, engine="pyarrow")
     print(f"Extraction complete. Loaded {len(df)} rows.")
     return df
 
@@ -66,4 +103,8 @@ def extract_eeoc_data():
 
 
 if __name__ == "__main__":
-    df = extract_eeoc_data()
+    parser = argparse.ArgumentParser(description="Copy a raw EEOC CSV into data/extracted and load it.")
+    parser.add_argument("--input", help="Path to the raw EEOC CSV (default: data/EEO1_2023_PUF.csv)")
+    parser.add_argument("--chunksize", type=int, help="Stream the file in chunks of this many rows")
+    args = parser.parse_args()
+    df = extract_eeoc_data(chunksize=args.chunksize, source_path=args.input)
@@ -1,6 +1,6 @@
 """
 
-This script lists CSV files in the 'data/processed' directory,
+This script lists Parquet files in the 'data/processed' directory,
 prompts the user to select one of the files, and loads the selected
 file into a pandas DataFrame for further analysis.
 
@@ -12,14 +12,16 @@ import os
 import pandas as pd
 
 def list_processed_files():
-    # List all CSV files in 'data/processed' directory
+    # List all Parquet files in 'data/processed' directory; scandir entries
+    # carry their file type, so no extra stat() per entry is needed
     processed_dir = os.path.join('data', 'processed')
-    files = [f for f in os.listdir(processed_dir) if f.endswith('.csv')]
+    with os.scandir(processed_dir) as entries:
+        files = [e.name for e in entries if e.is_file() and e.name.endswith('.parquet')]
     return files
 
 def select_file(files):
     # Display available files and prompt user to select one
-    print("Available cleaned CSV files in data/processed/:")
+    print("Available cleaned Parquet files in data/processed/:")
     for i, f in enumerate(files):
         print(f"{i + 1}: {f}")
     while True:
@@ -30,12 +32,12 @@ def select_file(files):
             print("Invalid choice. Try again.")
 
 def load_data():
-    # List CSV files in processed folder
+    # List Parquet files in processed folder
     processed_dir = os.path.join('data', 'processed')
-    files = [f for f in os.listdir(processed_dir) if f.endswith('.csv')]
+    files = list_processed_files()
     
     if not files:
-        print("No processed CSV files found in data/processed/. Please run transform first.")
+        print("No processed Parquet files found in data/processed/. Please run transform first.")
         return None
 
     # Automatically pick the first file
@@ -43,7 +45,7 @@ def load_data():
     print(f"Automatically loading file: {filename}")
     
     file_path = os.path.join(processed_dir, filename)
-    df = pd.read_csv(file_path)
+    df = pd.read_parquet(file_path, engine='pyarrow')
     print(f"\nLoaded data from {file_path} - shape: {df.shape}")
     return df
 
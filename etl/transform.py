@@ -6,26 +6,178 @@ extracted into the 'data/extracted' folder.
 
 """
 
+import numpy as np
 import pandas as pd
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+import csv
+import argparse
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pyarrow import csv as pa_csv
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+
+# Histogram rendering: upper bound on worker processes and minimum columns per worker
+HIST_MAX_WORKERS = 8
+HIST_BATCH = 4
+
+# Geography and industry columns that identify a row; only rows sharing these
+# can be exact duplicates, so they narrow the full-row duplicate check
+DEDUP_KEYS = ['Nation', 'Region', 'Division', 'State', 'CBSA', 'County', 'NAICS2', 'NAICS3']
+
+# Low-cardinality location columns (expand list as needed)
+CATEGORICAL_COLS = ['Nation', 'Region', 'Division', 'State']
+# Demographic counts parsed to numbers ('*' marks a suppressed count)
+COUNT_COLS = ['WHT10', 'BLKT10', 'HISPT10', 'ASIANT10']
+RENAME_MAP = {
+    'NAICS2_Name': 'Industry_Sector',
+    'TOTAL10': 'Total_Employees',
+}
+
+# Streaming transform: bytes of CSV parsed per block, and the columns read as
+# integers. Suppressed counts ('*') can first appear in any block, so every
+# other column is read as text instead of being inferred from the first block
+STREAM_BLOCK_SIZE = 64 << 20
+STREAM_INT_COLS = ['NAICS2', 'NAICS3', 'Establishments', 'TOTAL10']
+
+
+def _render_hists(batch, hist_folder):
+    # Standalone Figure (no pyplot state) so each worker process renders independently.
+    # One Figure/Axes is reused for the worker's whole batch of columns; bins are
+    # precomputed, so the worker only draws the bars
+    fig = Figure(figsize=(6,4))
+    ax = fig.subplots()
+    for counts, edges, col in batch:
+        ax.clear()
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='black')
+        ax.set_title(f'Histogram of {col}')
+        ax.set_xlabel(col)
+        ax.set_ylabel('Count')
+        fig.tight_layout()
+        fig.savefig(os.path.join(hist_folder, f'hist_{col}.png'))
+
+def _duplicated_rows(df):
+    # Same result as df.duplicated(): hash the key columns first, then compare
+    # whole rows only among the (few) rows whose keys repeat
+    keys = [c for c in DEDUP_KEYS if c in df.columns]
+    if not keys:
+        return df.duplicated().to_numpy()
+    candidates = df.duplicated(subset=keys, keep=False).to_numpy()
+    dup_mask = np.zeros(len(df), dtype=bool)
+    if candidates.any():
+        dup_mask[candidates] = df[candidates].duplicated().to_numpy()
+    return dup_mask
+
+def _save_histograms(num, numeric_cols, hist_folder):
+    # Bin every column of a float32 block; only the small count/edge arrays are
+    # shipped to the rendering workers
+    os.makedirs(hist_folder, exist_ok=True)
+    hists = [(*np.histogram(num[:, i], bins=30), col) for i, col in enumerate(numeric_cols)]
+    # One batch of columns per worker, so each worker sets up a single Figure;
+    # with several batches each holds at least HIST_BATCH columns to amortize
+    # process start-up, and a single batch is rendered in this process
+    n_batches = max(1, min(HIST_MAX_WORKERS, os.cpu_count() or 1, len(hists) // HIST_BATCH))
+    batches = [hists[i::n_batches] for i in range(n_batches)]
+    if n_batches == 1:
+        _render_hists(batches[0], hist_folder)
+    else:
+        with ProcessPoolExecutor(max_workers=n_batches) as executor:
+            list(executor.map(_render_hists, batches, [hist_folder] * n_batches))
+    print(f"Saved histograms for numeric columns to {hist_folder}/")
+
+def _write_value_counts(value_counts):
+    # Results are written with the multithreaded Arrow CSV writer
+    for col, counts in value_counts.items():
+        print(f"\nColumn: {col}")
+        print(counts.slice(0, 10).to_pandas())
+        pa_csv.write_csv(counts, f'data/processed/value_counts_{col}.csv')
+        print(f"Saved value counts for {col} to data/processed/value_counts_{col}.csv")
+
+def _parse_count(arr):
+    # '*' -> null and cast to float64, as Arrow compute kernels on the column buffers
+    if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+        arr = pc.if_else(pc.equal(arr, '*'), pa.scalar(None, arr.type), arr)
+    return pc.cast(arr, pa.float64())
+
+def _pct_of_total(counts, totals):
+    # float32 percentage: one 100 / total per row and a multiply rather than a
+    # per-element divide; zero totals give null
+    tot = pc.cast(totals, pa.float32())
+    tot = pc.if_else(pc.equal(tot, 0), pa.scalar(None, pa.float32()), tot)
+    inv = pc.divide(pa.scalar(100.0, pa.float32()), tot)
+    return pc.multiply(pc.cast(counts, pa.float32()), inv)
+
+def _in_runs(runs, values):
+    # True where a value is in any of the sorted runs (binary search per run)
+    found = np.zeros(len(values), dtype=bool)
+    for run in runs:
+        idx = np.minimum(np.searchsorted(run, values), len(run) - 1)
+        found |= run[idx] == values
+    return found
+
+def _add_run(runs, new):
+    # Append a sorted run of values not in any run yet. Trailing runs no larger
+    # than the new one are merged into it first, so run sizes stay geometric:
+    # there are O(log N) runs and each value is merged O(log N) times. A stable
+    # sort of two sorted runs is a linear merge (timsort)
+    if len(new) == 0:
+        return
+    while runs and len(runs[-1]) <= len(new):
+        new = np.sort(np.concatenate([runs.pop(), new]), kind='stable')
+    runs.append(new)
+
+def _select_input(path):
+    # Returns (path, file name) of the CSV to transform, or None if there is none
+    if path is not None:
+        if not os.path.isfile(path):
+            print(f"{path} not found. Please run extract first.")
+            return None
+        print(f"Transforming {path}")
+        return path, os.path.basename(path)
 
-def transform_data():
     # List CSV files in the extracted data folder
     extracted_folder = os.path.join('data', 'extracted')
-    files = [f for f in os.listdir(extracted_folder) if f.endswith('.csv')]
+    with os.scandir(extracted_folder) as it:
+        files = [e.name for e in it if e.name.endswith('.csv') and e.is_file()]
     
     if not files:
         print("No CSV files found in data/extracted/. Please run extract first.")
-        return
+        return None
     
     # Automatically select the first (or only) file
     filename = files[0]
     print(f"Automatically selected file to transform: {filename}")
+    return os.path.join(extracted_folder, filename), filename
+
+def transform_data(path=None, persist=True):
+    """
+    Clean an extracted CSV and save EDA summaries and histograms.
+
+    Args:
+        path (str, optional): CSV to transform. Defaults to the first CSV in
+            data/extracted, so runs never need interactive input.
+        persist (bool): Also write the cleaned data to data/processed as Parquet.
+            The pipeline passes the returned DataFrame straight to analysis, so
+            this is only needed when the file itself is wanted.
+    Returns:
+        DataFrame: The cleaned and transformed data.
+    """
+    selected = _select_input(path)
+    if selected is None:
+        return
+    raw_path, filename = selected
     
-    raw_path = os.path.join(extracted_folder, filename)
-    df = pd.read_csv(raw_path)
+    # Parse with the multithreaded PyArrow reader into Arrow-backed columns.
+    # Location columns are read as Arrow strings and then cast to categoricals:
+    # asking the reader for 'category' directly fails when a column is entirely
+    # empty (e.g. the national rows), since Arrow infers a null type for it.
+    # pandas categoricals are used rather than ArrowDtype(pa.dictionary(...)):
+    # the reader leaves one dictionary per chunk (~4x the memory here) and
+    # pandas cannot read such columns back from Parquet
+    df = pd.read_csv(raw_path, engine='pyarrow', dtype_backend='pyarrow',
+                     dtype={col: pd.ArrowDtype(pa.string()) for col in CATEGORICAL_COLS})
+    df = df.astype({col: 'category' for col in CATEGORICAL_COLS if col in df.columns})
 
     # Display basic dataset info
     print("\n--- Dataset Inspection ---")
@@ -36,12 +188,16 @@ def transform_data():
     print("\nData types:")
     print(df.dtypes)
     print("\nMissing values per column:")
-    missing = df.isnull().sum()
+    # Arrow arrays carry their null count, so the missing-value summary comes
+    # from column metadata instead of a full isnull() scan of every cell
+    tbl = pa.Table.from_pandas(df, preserve_index=False)
+    missing = pd.Series([col.null_count for col in tbl.columns], index=df.columns)
     missing_percent = (missing / len(df)) * 100
     missing_df = pd.DataFrame({'MissingCount': missing, 'MissingPercent': missing_percent})
     print(missing_df)
     print("\nDuplicate rows count:")
-    print(df.duplicated().sum())
+    dup_mask = _duplicated_rows(df)
+    print(dup_mask.sum())
     
     # Save missing values summary for review
     os.makedirs('data/processed', exist_ok=True)
@@ -49,66 +205,236 @@ def transform_data():
     print("Saved missing values summary to data/processed/missing_values_summary.csv")
 
     # Remove duplicates and drop rows with missing values
-    df = df.drop_duplicates().dropna()
+    # (one combined row mask, reusing the duplicate mask from the inspection above)
+    keep = ~dup_mask & df.notna().all(axis=1).to_numpy()
+    df = df.iloc[keep].reset_index(drop=True)
 
-    # Clean string columns
-    str_cols = df.select_dtypes(include='object').columns
+    # Clean string columns by running Arrow's whitespace-trim kernel directly
+    # on each column's buffers, without going through the .str accessor
+    str_cols = df.select_dtypes(include=['object', 'string']).columns
     for col in str_cols:
-        df[col] = df[col].str.strip()
-
-    # Convert specific columns to categorical dtype if present
-    categorical_cols = ['Nation', 'Region', 'Division', 'State']  # expand list as needed
-    for col in categorical_cols:
-        if col in df.columns:
-            df[col] = df[col].astype('category')
-
-    # Rename columns for clarity
-    rename_map = {
-        'NAICS2_Name': 'Industry_Sector',
-        'TOTAL10': 'Total_Employees',
-    }
-    df = df.rename(columns=rename_map)
+        arr = pa.array(df[col])
+        # Entirely empty columns are read with Arrow's null type; nothing to trim
+        if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+            df[col] = pd.arrays.ArrowExtensionArray(pc.utf8_trim_whitespace(arr))
 
-    # Create new percentage variable for White employees if data present
-    if 'WHT10' in df.columns and 'TOTAL10' in df.columns:
-        df['Pct_White'] = df['WHT10'] / df['Total_Employees'] * 100
+    # Rename columns for clarity (relabels only; column buffers are not copied)
+    df = df.rename(columns=RENAME_MAP, copy=False)
 
-    # Summary statistics for numeric columns
+    # Summary statistics for numeric columns (count/mean/std/min/max only; the
+    # quartiles need a sort per column and are not used downstream)
     print("\nSummary statistics for numeric columns:")
-    num_summary = df.describe()
+    num_summary = df.select_dtypes('number').agg(['count', 'mean', 'std', 'min', 'max']).T
     print(num_summary)
     num_summary.to_csv('data/processed/numeric_summary_stats.csv')
     print("Saved numeric summary statistics to data/processed/numeric_summary_stats.csv")
 
-    # Value counts for categorical columns
+    # Value counts for categorical columns. The columns are categorical from the
+    # read, so counting is a bincount over the integer codes (no hashing)
     print("\nValue counts for categorical columns:")
-    for col in categorical_cols:
+    value_counts = {}
+    for col in CATEGORICAL_COLS:
         if col in df.columns:
-            print(f"\nColumn: {col}")
-            counts = df[col].value_counts()
-            print(counts.head(10))
-            counts.to_csv(f'data/processed/value_counts_{col}.csv')
-            print(f"Saved value counts for {col} to data/processed/value_counts_{col}.csv")
+            codes = df[col].cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(df[col].cat.categories))
+            order = np.argsort(-counts, kind='stable')
+            order = order[counts[order] > 0]
+            value_counts[col] = pa.table({
+                col: pa.array(df[col].cat.categories.to_numpy()[order].astype(str)),
+                'count': pa.array(counts[order]),
+            })
+    _write_value_counts(value_counts)
 
-    # Histograms for numeric columns
+    # Histograms for numeric columns, binned from one float32 block
     numeric_cols = df.select_dtypes(include='number').columns
-    hist_folder = 'data/processed/histograms'
-    os.makedirs(hist_folder, exist_ok=True)
-    for col in numeric_cols:
-        plt.figure(figsize=(6,4))
-        sns.histplot(df[col], kde=False, bins=30)
-        plt.title(f'Histogram of {col}')
-        plt.tight_layout()
-        plt.savefig(os.path.join(hist_folder, f'hist_{col}.png'))
-        plt.close()
-    print(f"Saved histograms for numeric columns to {hist_folder}/")
+    num = df[numeric_cols].to_numpy(dtype=np.float32, na_value=np.nan)
+    _save_histograms(num, numeric_cols, 'data/processed/histograms')
 
-    # Save the cleaned and transformed data
-    processed_path = os.path.join('data', 'processed', f'transformed_{filename}')
-    df.to_csv(processed_path, index=False)
-    print(f"Cleaned data saved to {processed_path}")
+    # Suppressed counts are published as '*'; store the demographic counts as
+    # numbers so downstream stages load them already typed
+    parsed = {}
+    for col in [c for c in COUNT_COLS if c in df.columns]:
+        parsed[col] = _parse_count(pa.array(df[col]))
+        df[col] = parsed[col].to_numpy(zero_copy_only=False)
+
+    # Create new percentage variable for White employees if data present, from
+    # the parsed Arrow count array; zero totals give NaN
+    if 'WHT10' in parsed and 'Total_Employees' in df.columns:
+        pct_white = _pct_of_total(parsed['WHT10'], pa.array(df['Total_Employees']))
+        df['Pct_White'] = pct_white.to_numpy(zero_copy_only=False)
+
+    # Save the cleaned and transformed data as Parquet (typed, compressed, columnar)
+    if persist:
+        stem = os.path.splitext(filename)[0]
+        processed_path = os.path.join('data', 'processed', f'transformed_{stem}.parquet')
+        df.to_parquet(processed_path, engine='pyarrow', compression='zstd', row_group_size=256_000, index=False)
+        print(f"Cleaned data saved to {processed_path}")
 
     return df
 
+def transform_data_streaming(path=None, block_size=STREAM_BLOCK_SIZE):
+    """
+    Out-of-core version of transform_data() for CSVs too large to load at once.
+
+    The CSV is read block by block. Missing-value counts, duplicate detection,
+    value counts and the numeric summary are accumulated across blocks, and
+    each cleaned block is appended to data/processed/transformed_<name>.parquet.
+    Histograms are drawn afterwards from the numeric columns of that file.
+
+    Args:
+        path (str, optional): CSV to transform. Defaults to the first CSV in data/extracted.
+        block_size (int): Bytes of CSV parsed per block.
+    Returns:
+        str: Path of the transformed Parquet file.
+    """
+    selected = _select_input(path)
+    if selected is None:
+        return
+    raw_path, filename = selected
+
+    # Column types are fixed up front (see STREAM_INT_COLS) so every block has
+    # the same schema; empty strings and other NA markers are nulls, as in the
+    # full read
+    with open(raw_path, newline='') as f:
+        header = next(csv.reader(f))
+    column_types = {col: pa.int64() if col in STREAM_INT_COLS else pa.string() for col in header}
+    reader = pa_csv.open_csv(
+        raw_path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+    )
+
+    os.makedirs('data/processed', exist_ok=True)
+    stem = os.path.splitext(filename)[0]
+    processed_path = os.path.join('data', 'processed', f'transformed_{stem}.parquet')
+
+    n_rows = 0
+    n_dups = 0
+    missing = np.zeros(len(header), dtype=np.int64)
+    seen = []  # hashes of the rows seen so far, as sorted runs (see _add_run)
+    value_counts = {col: {} for col in CATEGORICAL_COLS if col in header}
+    numeric_cols = [RENAME_MAP.get(col, col) for col in header if col in STREAM_INT_COLS]
+    # Running count/mean/sum of squared deviations/min/max per numeric column
+    # (merged per block with Chan's parallel update, stable for the std)
+    stat_n = 0
+    stat_mean = np.zeros(len(numeric_cols))
+    stat_m2 = np.zeros(len(numeric_cols))
+    stat_min = np.full(len(numeric_cols), np.inf)
+    stat_max = np.full(len(numeric_cols), -np.inf)
+
+    writer = None
+    try:
+        for batch in reader:
+            n_rows += batch.num_rows
+            missing += [col.null_count for col in batch.columns]
+
+            # Exact duplicates across blocks, tracked by a 64-bit hash of each row
+            hashes = pd.util.hash_pandas_object(
+                batch.to_pandas(types_mapper=pd.ArrowDtype), index=False).to_numpy()
+            found = _in_runs(seen, hashes)
+            dup_mask = pd.Series(hashes).duplicated().to_numpy() | found
+            _add_run(seen, np.unique(hashes[~found]))
+            n_dups += int(dup_mask.sum())
+
+            # Remove duplicates and drop rows with missing values
+            keep = ~dup_mask
+            for col in batch.columns:
+                if col.null_count:
+                    keep &= col.is_valid().to_numpy(zero_copy_only=False)
+            batch = batch.filter(pa.array(keep))
+            if batch.num_rows == 0:
+                continue
+
+            # Trim string columns, rename, parse counts and derive Pct_White
+            columns = {}
+            for name, col in zip(batch.schema.names, batch.columns):
+                if pa.types.is_string(col.type):
+                    col = pc.utf8_trim_whitespace(col)
+                if name in COUNT_COLS:
+                    col = _parse_count(col)
+                columns[RENAME_MAP.get(name, name)] = col
+            if 'WHT10' in columns and 'Total_Employees' in columns:
+                columns['Pct_White'] = _pct_of_total(columns['WHT10'], columns['Total_Employees'])
+            table = pa.table(columns)
+
+            for col, counts in value_counts.items():
+                for item in pc.value_counts(table[col]).to_pylist():
+                    counts[item['values']] = counts.get(item['values'], 0) + item['counts']
+
+            block = np.column_stack([table[col].to_numpy() for col in numeric_cols]).astype(np.float64)
+            b_n = len(block)
+            b_mean = block.mean(axis=0)
+            b_m2 = ((block - b_mean) ** 2).sum(axis=0)
+            delta = b_mean - stat_mean
+            total = stat_n + b_n
+            stat_mean = stat_mean + delta * b_n / total
+            stat_m2 = stat_m2 + b_m2 + delta ** 2 * stat_n * b_n / total
+            stat_n = total
+            np.minimum(stat_min, block.min(axis=0), out=stat_min)
+            np.maximum(stat_max, block.max(axis=0), out=stat_max)
+
+            if writer is None:
+                writer = pq.ParquetWriter(processed_path, table.schema, compression='zstd')
+            writer.write_table(table, row_group_size=256_000)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print(f"\nStreamed {n_rows} rows from {filename}")
+    missing_df = pd.DataFrame({'MissingCount': missing, 'MissingPercent': missing / max(n_rows, 1) * 100},
+                              index=header)
+    print("\nMissing values per column:")
+    print(missing_df)
+    missing_df.to_csv('data/processed/missing_values_summary.csv')
+    print("Saved missing values summary to data/processed/missing_values_summary.csv")
+    print("\nDuplicate rows count:")
+    print(n_dups)
+
+    if writer is None:
+        print("No complete rows remained after cleaning.")
+        return
+
+    print("\nSummary statistics for numeric columns:")
+    num_summary = pd.DataFrame({
+        'count': float(stat_n),
+        'mean': stat_mean,
+        'std': np.sqrt(stat_m2 / (stat_n - 1)) if stat_n > 1 else np.nan,
+        'min': stat_min,
+        'max': stat_max,
+    }, index=numeric_cols)
+    print(num_summary)
+    num_summary.to_csv('data/processed/numeric_summary_stats.csv')
+    print("Saved numeric summary statistics to data/processed/numeric_summary_stats.csv")
+
+    # Same ordering as the full transform: descending count, ties by value
+    print("\nValue counts for categorical columns:")
+    tables = {}
+    for col, counts in value_counts.items():
+        items = sorted(counts.items(), key=lambda kv: kv[0])
+        items.sort(key=lambda kv: kv[1], reverse=True)
+        tables[col] = pa.table({
+            col: pa.array([k for k, _ in items], type=pa.string()),
+            'count': pa.array([v for _, v in items], type=pa.int64()),
+        })
+    _write_value_counts(tables)
+
+    # Histograms need global bin edges, so they are drawn from the written file,
+    # reading only the numeric columns
+    num = pq.read_table(processed_path, columns=numeric_cols).to_pandas().to_numpy(dtype=np.float32)
+    _save_histograms(num, numeric_cols, 'data/processed/histograms')
+
+    print(f"Cleaned data saved to {processed_path}")
+    return processed_path
+
 if __name__ == "__main__":
-    transform_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean an extracted EEOC CSV and save EDA outputs.")
+    parser.add_argument("--input", help="CSV to transform (default: first CSV in data/extracted)")
+    parser.add_argument("--no-persist", dest="persist", action="store_false",
+                        help="Do not write the transformed Parquet file")
+    parser.add_argument("--stream", action="store_true",
+                        help="Process the CSV block by block instead of loading it whole")
+    args = parser.parse_args()
+    if args.stream:
+        transform_data_streaming(path=args.input)
+    else:
+        transform_data(path=args.input, persist=args.persist)
\ No newline at end of file
@@ -14,17 +14,22 @@ Logging and error handling are included to improve robustness and traceability.
 """
 
 import os
+import re
 import sys
+import argparse
 import logging
 import csv
 
 # Importing project modules organized by stage
 from etl.extract import extract_eeoc_data
-from etl.transform import transform_data
+from etl.transform import transform_data, transform_data_streaming
 from analysis.model import run_analysis
 from analysis.evaluate import evaluate_models
 from vis.visualizations import visualize_all  # Visualization logic is wrapped in a single function
 
+# Names produced by rename_extracted_files()
+EXTRACTED_NAME_RE = re.compile(r"data_dictionary_extracted_\d{3}\.csv")
+
 
 def save_data_dictionary(df, filename='data_dictionary_analyzed.csv'):
     """
@@ -67,29 +72,37 @@ def rename_extracted_files():
     where XXX is a zero-padded index starting from 001.
 
     Logs warnings if the directory or CSV files are missing, and info messages
-    for successful renames or skipped files.
+    for successful renames or skipped files. Returns without renaming when
+    every CSV already follows the naming scheme.
     """
     extracted_dir = os.path.join('data', 'extracted')
     if not os.path.exists(extracted_dir):
         logging.warning(f"Directory {extracted_dir} does not exist.")
         return
     
-    files = [f for f in os.listdir(extracted_dir) if f.endswith('.csv')]
-    if not files:
+    # One directory scan; target names are checked against this set instead of
+    # stat-ing each new path
+    with os.scandir(extracted_dir) as it:
+        entries = [e for e in it if e.name.endswith('.csv')]
+    if not entries:
         logging.warning("No CSV files found in data/extracted/")
         return
+    if all(EXTRACTED_NAME_RE.fullmatch(e.name) for e in entries):
+        logging.info("Extracted CSV files are already renamed.")
+        return
+    existing = {e.name for e in entries}
     
-    for i, filename in enumerate(files, start=1):
+    for i, entry in enumerate(entries, start=1):
         new_name = f"data_dictionary_extracted_{i:03}.csv"
-        old_path = os.path.join(extracted_dir, filename)
-        new_path = os.path.join(extracted_dir, new_name)
         
-        if os.path.exists(new_path):
-            logging.info(f"Skipping rename for {filename} because {new_name} already exists.")
+        if new_name in existing:
+            logging.info(f"Skipping rename for {entry.name} because {new_name} already exists.")
             continue
         
-        os.rename(old_path, new_path)
-        logging.info(f"Renamed '{filename}' to '{new_name}'")
+        os.rename(entry.path, os.path.join(extracted_dir, new_name))
+        existing.discard(entry.name)
+        existing.add(new_name)
+        logging.info(f"Renamed '{entry.name}' to '{new_name}'")
 
 def main():
     """
@@ -105,7 +118,20 @@ def main():
     Logging:
     - All pipeline stages log info and error messages to `pipeline.log`.
     - Errors at critical stages terminate the pipeline with sys.exit(1).
+
+    The transformed data is handed to the analysis stage in memory; pass
+    --persist to also write it to `data/processed/` as Parquet. With --stream
+    the CSV is transformed block by block into that Parquet file, which the
+    analysis stage then loads.
     """
+    parser = argparse.ArgumentParser(description="Run the EEOC data pipeline.")
+    parser.add_argument('--persist', action='store_true',
+                        help="Also save the transformed data to data/processed/")
+    parser.add_argument('--stream', action='store_true',
+                        help="Transform the CSV block by block for files too large for memory "
+                             "(always writes data/processed/)")
+    args = parser.parse_args()
+
     # Configure logging
     logging.basicConfig(
         filename='pipeline.log',
@@ -117,8 +143,13 @@ def main():
     # Step 1: Extract
     logging.info("=== Step 1: Extract ===")
     try:
-        df_extracted = extract_eeoc_data()  # automatically grabs EEO1_2023_PUF.csv
-        logging.info(f"Extraction completed. {len(df_extracted)} rows loaded.")
+        if args.stream:
+            # Only place the file; its rows are read block by block by the transform
+            extracted_path = extract_eeoc_data(load=False)
+            logging.info(f"Extraction completed. {extracted_path} will be streamed during transform.")
+        else:
+            df_extracted = extract_eeoc_data()  # automatically grabs EEO1_2023_PUF.csv
+            logging.info(f"Extraction completed. {len(df_extracted)} rows loaded.")
     except Exception as e:
         logging.error(f"Extraction failed: {e}")
         sys.exit(1)
@@ -126,10 +157,19 @@ def main():
     # Step 2: Transform
     logging.info("=== Step 2: Transform ===")
     try:
-        df_transformed = transform_data()
-        if df_transformed is None:
-            raise ValueError("Transformation returned no data")
-        logging.info(f"Transformation completed. {len(df_transformed)} rows processed.")
+        if args.stream:
+            # Analysis loads the written Parquet file instead of an in-memory frame
+            df_transformed = None
+            processed_path = transform_data_streaming(path=extracted_path)
+            if processed_path is None:
+                raise ValueError("Transformation returned no data")
+            logging.info(f"Transformation completed. Output streamed to {processed_path}.")
+        else:
+            processed_path = None
+            df_transformed = transform_data(persist=args.persist)
+            if df_transformed is None:
+                raise ValueError("Transformation returned no data")
+            logging.info(f"Transformation completed. {len(df_transformed)} rows processed.")
     except Exception as e:
         logging.error(f"Transformation failed: {e}")
         sys.exit(1)
@@ -137,7 +177,7 @@ def main():
     # Step 3: Analyze
     logging.info("=== Step 3: Analyze ===")
     try:
-        df_analyzed = run_analysis()
+        df_analyzed = run_analysis(df=df_transformed, path=processed_path)
         if df_analyzed is None:
             raise ValueError("Analysis returned no data")
         logging.info("Analysis completed successfully.")
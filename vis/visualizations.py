@@ -7,8 +7,8 @@ This script generates visualizations based on pre-computed analysis files. The f
 3. A bar chart showing mean demographic percentages with standard deviations.
 
 Input files are expected to be located in the /data/analysis/ directory:
-- clustered_employers.csv
-- comparative_region.csv
+- clustered_employers.parquet
+- comparative_region_ranked.parquet
 - descriptive_stats.csv
 
 """
@@ -17,61 +17,106 @@ Input files are expected to be located in the /data/analysis/ directory:
 
 
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # PNG output only; never initialize a GUI toolkit
 import seaborn as sns
 import matplotlib.pyplot as plt
+from cycler import cycler
 import os
 
+# seaborn whitegrid theme (style, context and deep palette), built once at import
+# and applied per call with plt.rc_context so the global rcParams are never
+# changed. Naming the font directly keeps font lookup a cache hit on each savefig
+_THEME_RC = {
+    **sns.axes_style("whitegrid"),
+    **sns.plotting_context("notebook"),
+    "axes.prop_cycle": cycler(color=sns.color_palette("deep")),
+    "font.family": "DejaVu Sans",
+}
+
+def _read_analysis_file(parquet_path, columns=None):
+    # Prefer the Parquet output; fall back to a CSV of the same name written
+    # by earlier versions of the pipeline. Returns None if neither exists.
+    # Only `columns` are read, so other column chunks are skipped on disk.
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path, engine="pyarrow", columns=columns)
+    csv_path = os.path.splitext(parquet_path)[0] + ".csv"
+    if os.path.exists(csv_path):
+        return pd.read_csv(csv_path, usecols=columns)
+    return None
+
 def visualize_all():
-    # Ensure consistent styling
-    sns.set(style="whitegrid")
+    # The theme applies only while these figures are drawn; the caller's
+    # rcParams (e.g. for the transform histograms) are restored on exit
+    with plt.rc_context(_THEME_RC):
+        _draw_all()
 
+def _draw_all():
     # Paths
     analysis_path = os.path.join("data", "analysis")
     output_path = os.path.join("data", "outputs")
     os.makedirs(output_path, exist_ok=True)
 
+    # One figure is cleared and resized for each plot instead of creating a new
+    # figure and canvas every time
+    fig = plt.figure()
+
     # Visualization 1: Clustered Employers
-    cluster_file = os.path.join(analysis_path, "clustered_employers.csv")
-    if os.path.exists(cluster_file):
-        df_cluster = pd.read_csv(cluster_file)
-        plt.figure(figsize=(10, 6))
-        # Use two demographic columns for x and y
-        sns.scatterplot(
-            data=df_cluster,
-            x="Pct_White",
-            y="Pct_Black",
-            hue="Cluster",
-            palette="tab10"
-        )
-        plt.title("Employer Clusters (White vs Black %)")
-        plt.xlabel("Percent White Employees")
-        plt.ylabel("Percent Black Employees")
-        plt.legend(title="Cluster")
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_path, "clustered_employers_plot.png"))
-        plt.close()
+    cluster_file = os.path.join(analysis_path, "clustered_employers.parquet")
+    df_cluster = _read_analysis_file(cluster_file, columns=["Pct_White", "Pct_Black", "Cluster"])
+    if df_cluster is not None:
+        fig.clf()
+        fig.set_size_inches(10, 6)
+        ax = fig.subplots()
+        # Use two demographic columns for x and y; one scatter call per cluster
+        # on plain NumPy arrays, colored from the tab10 palette
+        palette = plt.get_cmap("tab10")
+        for i, (cluster_id, group) in enumerate(df_cluster.groupby("Cluster", sort=True)):
+            ax.scatter(
+                group["Pct_White"].to_numpy(),
+                group["Pct_Black"].to_numpy(),
+                color=palette(i),
+                edgecolors="white",
+                linewidths=0.5,
+                label=str(cluster_id)
+            )
+        ax.set_title("Employer Clusters (White vs Black %)")
+        ax.set_xlabel("Percent White Employees")
+        ax.set_ylabel("Percent Black Employees")
+        ax.legend(title="Cluster")
+        fig.tight_layout()
+        fig.savefig(os.path.join(output_path, "clustered_employers_plot.png"))
     else:
-        print("clustered_employers.csv not found")
+        print("clustered_employers.parquet not found")
 
     # You can keep your other visualizations unchanged
 
 
     # Visualization 2: Comparative Region Analysis
-    region_file = os.path.join(analysis_path, "comparative_region.csv")
-    if os.path.exists(region_file):
-        df_region = pd.read_csv(region_file)
-        print("Columns in comparative_region.csv:", df_region.columns.tolist())  # Optional debug print
-
-        plt.figure(figsize=(12, 6))
-        sns.barplot(data=df_region, x="Region", y="Pct_White", palette="pastel")
-        plt.title("Mean % White Employees by Region")
-        plt.xticks(rotation=45)
-        plt.ylabel("Percent White")
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_path, "comparative_region_plot.png"))
-        plt.close()
+    region_file = os.path.join(analysis_path, "comparative_region_ranked.parquet")
+    df_region = _read_analysis_file(region_file, columns=["Region", "Pct_White"])
+    if df_region is not None:
+        fig.clf()
+        fig.set_size_inches(12, 6)
+        ax = fig.subplots()
+        # Mean per region computed once (the analysis file already has one row
+        # per region), drawn directly instead of seaborn's bootstrapped estimate
+        region_means = df_region.groupby("Region", observed=True, sort=True)["Pct_White"].mean()
+        ax.bar(
+            region_means.index.astype(str),
+            region_means.to_numpy(),
+            width=0.8,
+            color=sns.color_palette("pastel", len(region_means))
+        )
+        ax.grid(False, axis="x")
+        ax.set_xlabel("Region")
+        ax.set_title("Mean % White Employees by Region")
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.set_ylabel("Percent White")
+        fig.tight_layout()
+        fig.savefig(os.path.join(output_path, "comparative_region_plot.png"))
     else:
-        print("comparative_region.csv not found")
+        print("comparative_region_ranked.parquet not found")
 
 
     # Visualization 3: Descriptive Stats
@@ -83,14 +128,17 @@ def visualize_all():
         means = df_desc['mean']
         stds = df_desc['std']
         
-        plt.figure(figsize=(8, 6))
-        plt.bar(means.index, means, yerr=stds, capsize=5, color='skyblue')
-        plt.ylabel('Percentage (%)')
-        plt.title('Mean Demographic Percentages with Standard Deviation')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_path, "descriptive_stats_barplot.png"))
-        plt.close()
+        fig.clf()
+        fig.set_size_inches(8, 6)
+        ax = fig.subplots()
+        ax.bar(means.index, means, yerr=stds, capsize=5, color='skyblue')
+        ax.set_ylabel('Percentage (%)')
+        ax.set_title('Mean Demographic Percentages with Standard Deviation')
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
+        fig.savefig(os.path.join(output_path, "descriptive_stats_barplot.png"))
     else:
         print("descriptive_stats.csv not found")
+
+    plt.close(fig)
     
\ No newline at end of file